@@ -42,6 +42,13 @@ def get_fp16_enabled(param_dict):
         return False
 
 
+def get_fast_math_enabled(param_dict):
+    fast_math = get_scalar_param(param_dict, FAST_MATH, FAST_MATH_DEFAULT)
+    if fast_math is None:
+        return get_fp16_enabled(param_dict)
+    return fast_math
+
+
 def get_loss_scale(param_dict):
     if get_fp16_enabled(param_dict):
         return get_scalar_param(param_dict[FP16],
@@ -105,6 +112,10 @@ def get_sparse_gradients_enabled(param_dict):
     return get_scalar_param(param_dict, SPARSE_GRADIENTS, SPARSE_GRADIENTS_DEFAULT)
 
 
+def get_overlap_comm(param_dict):
+    return get_scalar_param(param_dict, OVERLAP_COMM, OVERLAP_COMM_DEFAULT)
+
+
 def get_zero_optimization(param_dict):
     return get_scalar_param(param_dict, ZERO_OPTIMIZATION, ZERO_OPTIMIZATION_DEFAULT)
 
@@ -132,6 +143,10 @@ def get_allreduce_always_fp32(param_dict):
     return get_scalar_param(param_dict, FP32_ALLREDUCE, FP32_ALLREDUCE_DEFAULT)
 
 
+def get_allreduce_bf16(param_dict):
+    return get_scalar_param(param_dict, BF16_ALLREDUCE, BF16_ALLREDUCE_DEFAULT)
+
+
 def get_prescale_gradients(param_dict):
     return get_scalar_param(param_dict, PRESCALE_GRADIENTS, PRESCALE_GRADIENTS_DEFAULT)
 
@@ -146,6 +161,14 @@ def get_steps_per_print(param_dict):
     return get_scalar_param(param_dict, STEPS_PER_PRINT, STEPS_PER_PRINT_DEFAULT)
 
 
+def get_compile_forward(param_dict):
+    return get_scalar_param(param_dict, COMPILE_FORWARD, COMPILE_FORWARD_DEFAULT)
+
+
+def get_async_checkpoint(param_dict):
+    return get_scalar_param(param_dict, ASYNC_CHECKPOINT, ASYNC_CHECKPOINT_DEFAULT)
+
+
 def get_disable_allgather(param_dict):
     return get_scalar_param(param_dict, DISABLE_ALLGATHER, DISABLE_ALLGATHER_DEFAULT)
 
@@ -314,12 +337,16 @@ class DeepSpeedConfig(object):
         self.gradient_accumulation_steps = get_gradient_accumulation_steps(param_dict)
         self.steps_per_print = get_steps_per_print(param_dict)
         self.dump_state = get_dump_state(param_dict)
+        self.async_checkpoint = get_async_checkpoint(param_dict)
+        self.compile_forward = get_compile_forward(param_dict)
 
         self.disable_allgather = get_disable_allgather(param_dict)
         self.allreduce_always_fp32 = get_allreduce_always_fp32(param_dict)
+        self.allreduce_bf16 = get_allreduce_bf16(param_dict)
         self.prescale_gradients = get_prescale_gradients(param_dict)
         self.gradient_predivide_factor = get_gradient_predivide_factor(param_dict)
         self.sparse_gradients_enabled = get_sparse_gradients_enabled(param_dict)
+        self.overlap_comm = get_overlap_comm(param_dict)
 
         self.allgather_size = get_allgather_size(param_dict)
 
@@ -332,6 +359,7 @@ class DeepSpeedConfig(object):
 
         self.gradient_clipping = get_gradient_clipping(param_dict)
         self.fp16_enabled = get_fp16_enabled(param_dict)
+        self.fast_math_enabled = get_fast_math_enabled(param_dict)
         self.amp_enabled = get_amp_enabled(param_dict)
         self.amp_params = get_amp_params(param_dict)
         self.loss_scale = get_loss_scale(param_dict)
@@ -458,6 +486,13 @@ class DeepSpeedConfig(object):
             assert self.fp16_enabled, "DeepSpeedConfig: ZeRO is only supported if fp16 is enabled"
             assert self.zero_optimization_stage <= MAX_STAGE_ZERO_OPTIMIZATION, "DeepSpeedConfig: Maximum supported ZeRO stage is {}".format(MAX_STAGE_ZERO_OPTIMIZATION)
 
+        assert not (self.allreduce_always_fp32 and self.allreduce_bf16), "DeepSpeedConfig: {} and {} cannot both be enabled".format(FP32_ALLREDUCE, BF16_ALLREDUCE)
+        assert not (self.allreduce_bf16 and self.zero_enabled), "DeepSpeedConfig: {} is not supported with ZeRO".format(BF16_ALLREDUCE)
+
+        if self.overlap_comm:
+            assert not self.zero_enabled, "DeepSpeedConfig: {} is not supported with ZeRO, use the ZeRO overlap_comm option instead".format(OVERLAP_COMM)
+            assert not self.amp_enabled, "DeepSpeedConfig: {} is not supported with AMP".format(OVERLAP_COMM)
+
         assert self.train_micro_batch_size_per_gpu, "DeepSpeedConfig: {} is not defined".format(TRAIN_MICRO_BATCH_SIZE_PER_GPU)
 
         assert self.gradient_accumulation_steps, 'DeepSpeedConfig: {} is not defined'.format(
@@ -76,6 +76,10 @@ GRADIENT_ACCUMULATION_STEPS_DEFAULT = None
 SPARSE_GRADIENTS = "sparse_gradients"
 SPARSE_GRADIENTS_DEFAULT = False
 
+# Overlap gradient allreduce with backward (non-ZeRO data parallel training)
+OVERLAP_COMM = "overlap_comm"
+OVERLAP_COMM_DEFAULT = False
+
 #########################################
 # FP16 support
 #########################################
@@ -117,6 +121,19 @@ FP16_HYSTERESIS_DEFAULT = 2
 FP16_MIN_LOSS_SCALE = "min_loss_scale"
 FP16_MIN_LOSS_SCALE_DEFAULT = 1
 
+#########################################
+# Fast math
+#########################################
+# Fast math. By default, this feature is enabled when fp16 is enabled.
+# Enables cudnn autotuning and TF32 math on Ampere and newer GPUs.
+# Users can configure in ds_config.json as below example:
+FAST_MATH_FORMAT = '''
+Fast math should be enabled as:
+"enable_fast_math": true
+'''
+FAST_MATH = "enable_fast_math"
+FAST_MATH_DEFAULT = None
+
 #########################################
 # Apex AMP support
 #########################################
@@ -188,6 +205,18 @@ FP32 Allreduce should be enabled as:
 FP32_ALLREDUCE = "fp32_allreduce"
 FP32_ALLREDUCE_DEFAULT = False
 
+#########################################
+# BF16 AllReduce
+#########################################
+# BF16 All reduce of fp16 gradients. By default, this feature is not enabled.
+# Users can configure in ds_config.json as below example:
+BF16_ALLREDUCE_FORMAT = '''
+BF16 Allreduce should be enabled as:
+"bf16_allreduce": true
+'''
+BF16_ALLREDUCE = "bf16_allreduce"
+BF16_ALLREDUCE_DEFAULT = False
+
 #########################################
 # Scale/predivide gradients before allreduce
 #########################################
@@ -231,6 +260,30 @@ Dump state should be enabled as:
 DUMP_STATE = 'dump_state'
 DUMP_STATE_DEFAULT = False
 
+#########################################
+# Compile forward
+#########################################
+# Compile the model forward pass with torch.compile (torch>=2.0). By default,
+# this feature is not enabled. Users can configure in ds_config.json as below example:
+COMPILE_FORWARD_FORMAT = '''
+Forward compilation should be enabled as:
+"compile_forward": true
+'''
+COMPILE_FORWARD = "compile_forward"
+COMPILE_FORWARD_DEFAULT = False
+
+#########################################
+# Asynchronous checkpoint save
+#########################################
+# Asynchronous checkpoint save. By default, this feature is not enabled.
+# Users can configure in ds_config.json as below example:
+ASYNC_CHECKPOINT_FORMAT = '''
+Asynchronous checkpoint save should be enabled as:
+"async_checkpoint": true
+'''
+ASYNC_CHECKPOINT = "async_checkpoint"
+ASYNC_CHECKPOINT_DEFAULT = False
+
 #########################################
 # Vocabulary size
 #########################################
@@ -4,13 +4,15 @@ Copyright 2019 The Microsoft DeepSpeed Team
 
 import torch
 import os
+import copy
+import contextlib
+import logging
 import warnings
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
 import torch.distributed as dist
 from torch.nn.modules import Module
 from torch.distributed.distributed_c10d import _get_global_rank
-from apex import amp
-
-from tensorboardX import SummaryWriter
 
 from deepspeed.pt.deepspeed_timer import ThroughputTimer, SynchronizedWallClockTimer
 from deepspeed.pt.deepspeed_zero_optimizer import FP16_DeepSpeedZeroOptimizer
@@ -34,6 +36,10 @@ import deepspeed.pt.deepspeed_lr_schedules as lr_schedules
 from deepspeed.pt.deepspeed_csr_tensor import CSRTensor
 
 MEMORY_OPT_ALLREDUCE_SIZE = 500000000
+OVERLAP_COMM_BUCKET_SIZE = 25000000
+ALLREDUCE_BUCKETS_IN_FLIGHT = 2
+ZERO_CHECKPOINT_LOAD_WORKERS = 32
+LOSS_SUMMARY_SLOTS = 16
 SUMMARY_WRITER_DIR_NAME = "JobId"
 
 try:
@@ -50,20 +56,28 @@ except ImportError:
     from torch._utils import _flatten_dense_tensors as flatten
     from torch._utils import _unflatten_dense_tensors as unflatten
 
+CSR_TENSOR_TYPE = CSRTensor.type()
+SPLIT_BUCKET_TYPES = ("torch.cuda.HalfTensor",
+                      "torch.cuda.FloatTensor",
+                      "torch.cuda.DoubleTensor",
+                      CSR_TENSOR_TYPE)
+
 
 def split_half_float_double_csr(tensors):
-    dtypes = [
-        "torch.cuda.HalfTensor",
-        "torch.cuda.FloatTensor",
-        "torch.cuda.DoubleTensor",
-        CSRTensor.type()
-    ]
-    buckets = []
-    for i, dtype in enumerate(dtypes):
-        bucket = [t for t in tensors if t.type() == dtype]
-        if bucket:
-            buckets.append((dtype, bucket))
-    return buckets
+    groups = {dtype: [] for dtype in SPLIT_BUCKET_TYPES}
+    for t in tensors:
+        bucket = groups.get(t.type())
+        if bucket is not None:
+            bucket.append(t)
+    return [(dtype, groups[dtype]) for dtype in SPLIT_BUCKET_TYPES if groups[dtype]]
+
+
+@torch.jit.script
+def _scale_tensors(tensors: List[torch.Tensor], scale: float) -> List[torch.Tensor]:
+    scaled = []
+    for t in tensors:
+        scaled.append(t * scale)
+    return scaled
 
 
 def _initialize_parameter_parallel_groups(parameter_parallel_size=None):
@@ -75,21 +89,93 @@ def _initialize_parameter_parallel_groups(parameter_parallel_size=None):
                 parameter_parallel_size)
     assert data_parallel_size % parameter_parallel_size == 0, \
         'world size should be divisible by parameter parallel size'
-    rank = dist.get_rank()
+    if hasattr(dist, 'new_subgroups'):
+        # torch>=1.11 builds all the subgroups in a single call
+        my_group, _ = dist.new_subgroups(group_size=parameter_parallel_size)
+        return my_group
+
+    my_group_index = dist.get_rank() // parameter_parallel_size
     my_group = None
-    for i in range(dist.get_world_size() // parameter_parallel_size):
+    for i in range(data_parallel_size // parameter_parallel_size):
         ranks = range(i * parameter_parallel_size, (i + 1) * parameter_parallel_size)
         group = torch.distributed.new_group(ranks)
-        if rank in ranks:
+        if i == my_group_index:
             my_group = group
     return my_group
 
 
+def _nccl_2_10_available():
+    # NCCL 2.10 added ReduceOp.AVG and bfloat16 reductions, older torch
+    # reports the version as an int
+    if dist.get_backend() != "nccl":
+        return False
+    version = torch.cuda.nccl.version()
+    if isinstance(version, int):
+        return version >= 21000
+    return tuple(version) >= (2, 10)
+
+
+def _allreduce_avg_supported():
+    return hasattr(dist.ReduceOp, "AVG") and _nccl_2_10_available()
+
+
+def _allreduce_bf16_supported():
+    return hasattr(torch, "bfloat16") and _nccl_2_10_available()
+
+
+class _AllreduceHandle(object):
+    """Completes a gradient allreduce: waits on the collective, then applies
+    the postscale and copies the result back into the gradient buffer."""
+    def __init__(self, work, tensor, tensor_to_allreduce, postscale):
+        self.work = work
+        self.tensor = tensor
+        self.tensor_to_allreduce = tensor_to_allreduce
+        self.postscale = postscale
+
+    def wait(self):
+        if self.work is not None:
+            self.work.wait()
+        if self.postscale is not None:
+            self.tensor_to_allreduce.mul_(self.postscale)
+        if self.tensor is not self.tensor_to_allreduce:
+            self.tensor.copy_(self.tensor_to_allreduce)
+
+
+def _copy_to_cpu(obj, staging_buffer):
+    if torch.is_tensor(obj):
+        # Host tensors are copied as well, the background writer must not
+        # see later in-place updates such as the optimizer step count
+        buffer = staging_buffer(obj)
+        buffer.copy_(obj, non_blocking=obj.is_cuda)
+        return buffer
+    if isinstance(obj, dict):
+        # Shallow copy keeps the dict type and any attached metadata
+        copied = copy.copy(obj)
+        for key, value in copied.items():
+            copied[key] = _copy_to_cpu(value, staging_buffer)
+        return copied
+    if type(obj) in (list, tuple):
+        return type(obj)(_copy_to_cpu(value, staging_buffer) for value in obj)
+    return obj
+
+
+@contextlib.contextmanager
+def _no_timing():
+    yield
+
+
+def _save_when_ready(copy_done, state, path):
+    copy_done.synchronize()
+    torch.save(state, path)
+
+
 def print_configuration(args, name):
-    logger.info('{}:'.format(name))
+    if not logger.isEnabledFor(logging.INFO):
+        return
+    logger.info('%s:', name)
     for arg in sorted(vars(args)):
         dots = '.' * (29 - len(arg))
-        logger.info('  {} {} {}'.format(arg, dots, getattr(args, arg)))
+        logger.info('  %s %s %s', arg, dots, getattr(args, arg))
 
 
 class DeepSpeedLight(Module):
@@ -142,6 +228,7 @@ class DeepSpeedLight(Module):
 
         self._do_args_sanity_check(args)
         self._configure_with_arguments(args, mpu)
+        self._snapshot_config()
         self._do_sanity_check()
 
         self._init_distributed(dist_init_required)
@@ -149,6 +236,13 @@ class DeepSpeedLight(Module):
         self.sample_count = 0
         if self.tensorboard_enabled() and self.global_rank == 0:
             self.summary_writer = self.get_summary_writer()
+            # Training losses are copied to these pinned slots asynchronously
+            # and written once the copies have completed
+            self._loss_summary_buffer = torch.empty(LOSS_SUMMARY_SLOTS,
+                                                    dtype=torch.float32,
+                                                    pin_memory=True)
+            self._loss_summary_slot = 0
+            self._pending_loss_summaries = []
 
         # Configure distributed model
         self._configure_distributed_model(model)
@@ -174,14 +268,29 @@ class DeepSpeedLight(Module):
             self._configure_lr_scheduler(lr_scheduler)
             self._report_progress(0)
 
+        if self.compile_forward():
+            self._configure_compiled_forward()
+
         # Bookkeeping for csr support
         self.csr_tensor_module_names = set()
         if self.sparse_gradients_enabled():
-            for name, module in self.module.named_modules():
-                if isinstance(module, torch.nn.Embedding):
-                    self.csr_tensor_module_names.add(name + ".weight")
-                    logger.info("Will convert {} to sparse (csr) "
-                                "tensor during training".format(name))
+            self.csr_tensor_module_names = {
+                name + ".weight"
+                for name,
+                module in self.module.named_modules()
+                if isinstance(module,
+                              torch.nn.Embedding)
+            }
+            for name in self.csr_tensor_module_names:
+                logger.info("Will convert {} to sparse (csr) "
+                            "tensor during training".format(name))
+
+        self._configure_grad_table()
+
+        self._overlap_comm_active = False
+        self._overlap_generation = 0
+        if self.overlap_comm():
+            self._configure_overlap_comm()
 
         self.save_non_zero_checkpoint = False
         self.save_zero_checkpoint = False
@@ -232,7 +341,7 @@ class DeepSpeedLight(Module):
                     world_size, dist.get_world_size())
 
     def tensorboard_enabled(self):
-        return self._config.tensorboard_enabled
+        return self._tensorboard_enabled
 
     def tensorboard_output_path(self):
         return self._config.tensorboard_output_path
@@ -243,6 +352,7 @@ class DeepSpeedLight(Module):
     def get_summary_writer(self,
                            name="DeepSpeedJobName",
                            base=os.environ["HOME"] + "/tensorboard"):
+        from tensorboardX import SummaryWriter
         if self.tensorboard_job_name():
             name = self.tensorboard_job_name()
         if self.tensorboard_output_path():
@@ -252,19 +362,22 @@ class DeepSpeedLight(Module):
         return SummaryWriter(log_dir=os.path.join(base, SUMMARY_WRITER_DIR_NAME, name))
 
     def wall_clock_breakdown(self):
-        return self._config.wall_clock_breakdown
+        return self._wall_clock_breakdown
 
     def memory_breakdown(self):
-        return self._config.memory_breakdown
+        return self._memory_breakdown
 
     def sparse_gradients_enabled(self):
-        return self._config.sparse_gradients_enabled
+        return self._sparse_gradients_enabled
+
+    def overlap_comm(self):
+        return self._config.overlap_comm
 
     def train_batch_size(self):
         return self._config.train_batch_size
 
     def train_micro_batch_size_per_gpu(self):
-        return self._config.train_micro_batch_size_per_gpu
+        return self._train_micro_batch_size_per_gpu
 
     def optimizer_name(self):
         return self._config.optimizer_name
@@ -282,19 +395,19 @@ class DeepSpeedLight(Module):
         return self._config.scheduler_params
 
     def zero_optimization(self):
-        return self._config.zero_enabled
+        return self._zero_enabled
 
     def zero_allow_untested_optimizer(self):
         return self._config.zero_allow_untested_optimizer
 
     def zero_reduce_scatter(self):
-        return self._config.zero_config.reduce_scatter
+        return self._zero_reduce_scatter
 
     def zero_overlap_comm(self):
         return self._config.zero_config.overlap_comm
 
     def zero_optimization_stage(self):
-        return self._config.zero_optimization_stage
+        return self._zero_optimization_stage
 
     def zero_reduce_bucket_size(self):
         return self._config.zero_config.reduce_bucket_size
@@ -315,10 +428,13 @@ class DeepSpeedLight(Module):
         return self._config.allgather_size
 
     def fp16_enabled(self):
-        return self._config.fp16_enabled
+        return self._fp16_enabled
+
+    def fast_math_enabled(self):
+        return self._config.fast_math_enabled
 
     def amp_enabled(self):
-        return self._config.amp_enabled
+        return self._amp_enabled
 
     def amp_params(self):
         return self._config.amp_params
@@ -327,19 +443,22 @@ class DeepSpeedLight(Module):
         return self._config.loss_scale
 
     def gradient_accumulation_steps(self):
-        return self._config.gradient_accumulation_steps
+        return self._grad_accum_steps
 
     def allreduce_always_fp32(self):
-        return self._config.allreduce_always_fp32
+        return self._allreduce_always_fp32
+
+    def allreduce_bf16(self):
+        return self._allreduce_bf16
 
     def postscale_gradients(self):
-        return not self._config.prescale_gradients
+        return self._postscale_gradients
 
     def gradient_predivide_factor(self):
-        return self._config.gradient_predivide_factor
+        return self._gradient_predivide_factor
 
     def steps_per_print(self):
-        return self._config.steps_per_print
+        return self._steps_per_print
 
     def zero_allgather_partitions(self):
         return self._config.zero_config.allgather_partitions
@@ -347,8 +466,14 @@ class DeepSpeedLight(Module):
     def dump_state(self):
         return self._config.dump_state
 
+    def async_checkpoint(self):
+        return self._config.async_checkpoint
+
+    def compile_forward(self):
+        return self._config.compile_forward
+
     def gradient_clipping(self):
-        return self._config.gradient_clipping
+        return self._gradient_clipping
 
     def dynamic_loss_scale(self):
         return self._config.loss_scale == 0
@@ -363,13 +488,13 @@ class DeepSpeedLight(Module):
         # First check for scheduler in json configuration
         lr_scheduler = self._scheduler_from_config(self.optimizer)
         if lr_scheduler:
-            logger.info(
-                f'DeepSpeed using configured LR scheduler = {self.scheduler_name()}')
+            logger.info('DeepSpeed using configured LR scheduler = %s',
+                        self.scheduler_name())
             self.lr_scheduler = lr_scheduler
         else:
             logger.warning('DeepSpeed using client LR scheduler')
             self.lr_scheduler = client_lr_scheduler
-        logger.info(f'DeepSpeed LR Scheduler = {self.lr_scheduler}')
+        logger.info('DeepSpeed LR Scheduler = %s', self.lr_scheduler)
 
     def _configure_checkpointing(self, dist_init_required):
 
@@ -387,6 +512,19 @@ class DeepSpeedLight(Module):
             # optimizer state checkpoints for zero
             self.save_zero_checkpoint = (pp_rank == dp_rank)
 
+        # Asynchronous saves stage the state to host through pinned buffers on
+        # a side stream and write it from a background thread. The buffers are
+        # reused across saves, keyed by shape and dtype, so they keep about one
+        # copy of the saved state pinned in host memory for the life of the
+        # engine. Synchronous saves write the state directly.
+        self._checkpoint_buffers = {}
+        self._checkpoint_buffers_used = {}
+        self._checkpoint_futures = []
+        self._checkpoint_executor = None
+        if self.async_checkpoint():
+            self._checkpoint_stream = torch.cuda.Stream()
+            self._checkpoint_executor = ThreadPoolExecutor(max_workers=1)
+
     def _scheduler_from_config(self, optimizer):
         scheduler_name = self.scheduler_name()
         if scheduler_name is not None:
@@ -417,6 +555,24 @@ class DeepSpeedLight(Module):
             self.global_rank = 0
             self.device = torch.device("cuda")
 
+        if self.fast_math_enabled():
+            torch.backends.cudnn.benchmark = True
+            # TF32 switches are only available in torch>=1.7
+            if hasattr(torch.backends.cuda, 'matmul'):
+                torch.backends.cuda.matmul.allow_tf32 = True
+            if hasattr(torch.backends.cudnn, 'allow_tf32'):
+                torch.backends.cudnn.allow_tf32 = True
+
+        # High priority stream for gradient allreduce, so that communication
+        # kernels are scheduled ahead of queued compute kernels
+        self.comm_stream = torch.cuda.Stream(priority=-1)
+        # One stream per gradient type, buckets of different types are
+        # independent of each other
+        self._bucket_streams = {
+            bucket_type: torch.cuda.Stream(priority=-1)
+            for bucket_type in SPLIT_BUCKET_TYPES
+        }
+
     # Configure based on command line arguments
     def _configure_with_arguments(self, args, mpu):
         self.local_rank = args.local_rank if hasattr(args, 'local_rank') else 0
@@ -424,6 +580,28 @@ class DeepSpeedLight(Module):
                                        mpu,
                                        param_dict=self.config_params)
 
+    # Cache config values queried on every micro-step as plain attributes
+    def _snapshot_config(self):
+        config = self._config
+        self._wall_clock_breakdown = config.wall_clock_breakdown
+        self._memory_breakdown = config.memory_breakdown
+        self._tensorboard_enabled = config.tensorboard_enabled
+        self._sparse_gradients_enabled = config.sparse_gradients_enabled
+        self._train_micro_batch_size_per_gpu = config.train_micro_batch_size_per_gpu
+        self._zero_enabled = config.zero_enabled
+        self._zero_optimization_stage = config.zero_optimization_stage
+        self._zero_reduce_scatter = config.zero_config.reduce_scatter
+        self._fp16_enabled = config.fp16_enabled
+        self._amp_enabled = config.amp_enabled
+        self._grad_accum_steps = config.gradient_accumulation_steps
+        self._grad_accum_scale = 1.0 / self._grad_accum_steps
+        self._allreduce_always_fp32 = config.allreduce_always_fp32
+        self._allreduce_bf16 = config.allreduce_bf16
+        self._postscale_gradients = not config.prescale_gradients
+        self._gradient_predivide_factor = config.gradient_predivide_factor
+        self._steps_per_print = config.steps_per_print
+        self._gradient_clipping = config.gradient_clipping
+
     # Validate command line arguments
     def _do_args_sanity_check(self, args):
         if hasattr(args, 'deepscale_config') and args.deepscale_config is not None:
@@ -460,18 +638,51 @@ class DeepSpeedLight(Module):
             assert self.dynamic_loss_scale(), \
                 'DeepSpeed {} optimizer requires dynamic loss scaling'.format(self.optimizer_name())
 
-    def _broadcast_model(self):
-        for p in self.module.parameters():
-            if torch.is_tensor(p):
-                dist.broadcast(p,
-                               self.broadcast_src_rank,
-                               group=self.data_parallel_group)
+    def _broadcast_model(self, numel_per_bucket=MEMORY_OPT_ALLREDUCE_SIZE):
+        # Broadcast flattened per-dtype buckets instead of one tensor at a time
+        buckets = {}
+        for p in self._all_params:
+            buckets.setdefault(p.dtype, []).append(p.data)
+
+        for bucket in buckets.values():
+            small_bucket = []
+            numel = 0
+            for tensor in bucket:
+                small_bucket.append(tensor)
+                numel = numel + tensor.numel()
+                if numel > numel_per_bucket:
+                    self._broadcast_and_copy(small_bucket)
+                    small_bucket = []
+                    numel = 0
+            if len(small_bucket) > 0:
+                self._broadcast_and_copy(small_bucket)
+
+    def _broadcast_and_copy(self, small_bucket):
+        flat = flatten(small_bucket)
+        dist.broadcast(flat, self.broadcast_src_rank, group=self.data_parallel_group)
+        # The source rank already holds the broadcast values
+        if not self._is_src_rank:
+            for buf, synced in zip(small_bucket, unflatten(flat, small_bucket)):
+                buf.copy_(synced)
 
     def _configure_distributed_model(self, model):
         self.module = model
-        if self.fp16_enabled():
-            self.module.half()
-        self.module.to(self.device)
+        with torch.cuda.device(self.device):
+            if self.fp16_enabled():
+                # Move each tensor to the device first and cast it there, in a
+                # single pass over the module. A CPU to GPU copy with a dtype
+                # change would otherwise do the conversion on the host.
+                def to_device_half(t):
+                    t = t.to(self.device, non_blocking=True)
+                    return t.half() if t.is_floating_point() else t
+
+                self.module._apply(to_device_half)
+            else:
+                self.module.to(self.device, non_blocking=True)
+
+        # Parameter objects are stable from here on: casts (including AMP's)
+        # and checkpoint loads update them in place
+        self._all_params = tuple(self.module.parameters())
 
         if self.mpu is None:
             self.data_parallel_group = _initialize_parameter_parallel_groups()
@@ -487,9 +698,156 @@ class DeepSpeedLight(Module):
                 0)
             logger.info(f"global src_rank={self.broadcast_src_rank}")
 
+        # Constants derived from the data parallel world size, used every step
+        self._inv_dp_world_size = 1.0 / self.dp_world_size
+        self._samples_per_step = (self.train_micro_batch_size_per_gpu() *
+                                  self.dp_world_size *
+                                  self.gradient_accumulation_steps())
+        self._allreduce_avg = _allreduce_avg_supported()
+        if self.allreduce_bf16():
+            assert _allreduce_bf16_supported(), \
+                "bf16_allreduce requires the nccl backend with NCCL >= 2.10"
+
+        # Cache whether this rank is the source of model broadcasts
+        self._is_src_rank = dist.get_rank(group=self.data_parallel_group) == 0
+
         if not self.amp_enabled():
             self._broadcast_model()
 
+    def _configure_compiled_forward(self):
+        if not hasattr(torch, 'compile'):
+            logger.warning(
+                "compile_forward requires torch>=2.0, running forward without compilation"
+            )
+            return
+        # Only forward is compiled, backward and the optimizer step stay eager.
+        # Module hooks and state_dict keys are unaffected since the module
+        # itself is not wrapped.
+        self.module.forward = torch.compile(self.module.forward)
+
+    def _configure_overlap_comm(self, bucket_size=OVERLAP_COMM_BUCKET_SIZE):
+        # Parameters are bucketed in reverse registration order, which roughly
+        # follows the order in which their gradients are produced by backward.
+        # Csr gradients keep going through the fallback path at the boundary.
+        # Buckets are rebuilt when parameters are frozen or unfrozen, hooks of
+        # earlier generations then become no-ops.
+        self._overlap_generation += 1
+        self._overlap_trainable = [param.requires_grad for param in self._all_params]
+        self.grad_accs = []
+        self._overlap_buckets = []
+        bucket = []
+        numel = 0
+        for param_name, param in reversed(list(self.module.named_parameters())):
+            if not param.requires_grad:
+                continue
+            if self._is_csr_param(param_name):
+                continue
+            if bucket and (numel + param.numel() > bucket_size
+                           or param.dtype != bucket[0].dtype):
+                self._overlap_buckets.append(bucket)
+                bucket = []
+                numel = 0
+            bucket.append(param)
+            numel += param.numel()
+        if bucket:
+            self._overlap_buckets.append(bucket)
+
+        # Gradients are reduced in persistent flat buffers and handed back to
+        # the parameters as views, so there is no copy back after the allreduce
+        self._overlap_flat_buffers = []
+        self._overlap_grad_views = []
+        for bucket in self._overlap_buckets:
+            flat_buffer = torch.zeros(sum(param.numel() for param in bucket),
+                                      dtype=bucket[0].dtype,
+                                      device=bucket[0].device)
+            grad_views = []
+            offset = 0
+            for param in bucket:
+                grad_views.append(
+                    flat_buffer.narrow(0,
+                                       offset,
+                                       param.numel()).view_as(param))
+                offset += param.numel()
+            self._overlap_flat_buffers.append(flat_buffer)
+            self._overlap_grad_views.append(grad_views)
+
+        generation = self._overlap_generation
+        for bucket_index, bucket in enumerate(self._overlap_buckets):
+            for param_index, param in enumerate(bucket):
+
+                def wrapper(param, bucket_index, param_index):
+                    param_tmp = param.expand_as(param)
+                    grad_acc = param_tmp.grad_fn.next_functions[0][0]
+
+                    def overlap_allreduce_hook(*notneeded):
+                        if generation == self._overlap_generation:
+                            self._overlap_grad_ready(bucket_index, param_index)
+
+                    grad_acc.register_hook(overlap_allreduce_hook)
+                    self.grad_accs.append(grad_acc)
+
+                wrapper(param, bucket_index, param_index)
+
+        self._reset_overlap_comm_state()
+
+    def _reset_overlap_comm_state(self):
+        self._overlap_pending = [len(bucket) for bucket in self._overlap_buckets]
+        self._overlap_param_ready = [[False] * len(bucket)
+                                     for bucket in self._overlap_buckets]
+        self._overlap_next_bucket = 0
+
+    def _overlap_grad_ready(self, bucket_index, param_index):
+        if not self._overlap_comm_active:
+            return
+        bucket_ready = self._overlap_param_ready[bucket_index]
+        if bucket_ready[param_index]:
+            # The gradient accumulator fired again within one backward, e.g. a
+            # weight shared across reentrant activation checkpoints. Further
+            # contributions are fine until the bucket has been launched.
+            assert bucket_index >= self._overlap_next_bucket, \
+                "overlap_comm: a gradient was produced again after its bucket " \
+                "was reduced, disable overlap_comm for this model"
+            return
+        bucket_ready[param_index] = True
+        self._overlap_pending[bucket_index] -= 1
+        # Buckets are launched strictly in order so that every rank issues
+        # the same sequence of collectives
+        while self._overlap_next_bucket < len(self._overlap_buckets) and \
+                self._overlap_pending[self._overlap_next_bucket] == 0:
+            self._overlap_launch_bucket(self._overlap_next_bucket)
+
+    def _overlap_launch_bucket(self, bucket_index):
+        self.comm_stream.wait_stream(torch.cuda.current_stream())
+        with torch.cuda.stream(self.comm_stream):
+            for param, grad_view in zip(self._overlap_buckets[bucket_index],
+                                        self._overlap_grad_views[bucket_index]):
+                if param.grad is None:
+                    grad_view.zero_()
+                elif param.grad.data_ptr() != grad_view.data_ptr():
+                    grad_view.copy_(param.grad.data)
+                    # The gradient is replaced by its view in the epilogue,
+                    # possibly before this copy has run
+                    param.grad.data.record_stream(self.comm_stream)
+            self.allreduce_flat_tensor(self._overlap_flat_buffers[bucket_index])
+        self._overlap_next_bucket = bucket_index + 1
+
+    def _overlap_comm_epilogue(self):
+        # Buckets still waiting on gradients, e.g. parameters unused on this
+        # rank, are reduced now in the same order as everywhere else
+        while self._overlap_next_bucket < len(self._overlap_buckets):
+            self._overlap_launch_bucket(self._overlap_next_bucket)
+
+        for bucket, grad_views in zip(self._overlap_buckets, self._overlap_grad_views):
+            for param, grad_view in zip(bucket, grad_views):
+                if param.grad is not None:
+                    param.grad = grad_view
+
+        for _, bucket in self._build_grad_buckets(csr_only=True):
+            self.csr_allreduce_no_retain(bucket)
+
+        self._overlap_comm_active = False
+        self._reset_overlap_comm_state()
+
     # Configure optimizer
     def _configure_optimizer(self, client_optimizer, model_parameters):
         if client_optimizer is not None:
@@ -497,11 +855,10 @@ class DeepSpeedLight(Module):
             logger.info('Using client Optimizer as basic optimizer')
         else:
             basic_optimizer = self._configure_basic_optimizer(model_parameters)
-            logger.info(
-                'Using DeepSpeed Optimizer param name {} as basic optimizer'.format(
-                    self.optimizer_name()))
+            logger.info('Using DeepSpeed Optimizer param name %s as basic optimizer',
+                        self.optimizer_name())
 
-        logger.info('DeepSpeed Basic Optimizer = {}'.format(basic_optimizer))
+        logger.info('DeepSpeed Basic Optimizer = %s', basic_optimizer)
 
         if self.zero_optimization():
             assert not self.amp_enabled(), "Amp and ZeRO are not currently compatible, please use (legacy) fp16 mode which performs similar to amp opt_mode=O2"
@@ -515,8 +872,9 @@ class DeepSpeedLight(Module):
             self.optimizer = self._configure_zero_optimizer(basic_optimizer)
         elif self.amp_enabled():
             assert not self.fp16_enabled(), "Cannot enable both amp with (legacy) fp16 mode"
+            from apex import amp
             amp_params = self.amp_params()
-            logger.info(f"Initializing AMP with these params: {amp_params}")
+            logger.info("Initializing AMP with these params: %s", amp_params)
             self.module, self.optimizer = amp.initialize(self.module, basic_optimizer, **amp_params)
             self._broadcast_model()
         elif self.fp16_enabled():
@@ -679,15 +1037,21 @@ class DeepSpeedLight(Module):
         self.module.train(False)
 
     def _scale_loss(self, prescaled_loss):
+        # Nothing to scale without gradient accumulation
+        if self._grad_accum_steps == 1:
+            return prescaled_loss
+
         if isinstance(prescaled_loss, torch.Tensor):
-            scaled_loss = prescaled_loss / self.gradient_accumulation_steps()
-        elif isinstance(prescaled_loss, tuple) or isinstance(prescaled_loss, list):
-            scaled_loss = []
-            for l in prescaled_loss:
-                if isinstance(l, torch.Tensor):
-                    scaled_loss.append(l / self.gradient_accumulation_steps())
-                else:
-                    scaled_loss.append(l)
+            scaled_loss = prescaled_loss * self._grad_accum_scale
+        elif isinstance(prescaled_loss, (tuple, list)):
+            scale = self._grad_accum_scale
+            if all(isinstance(l, torch.Tensor) for l in prescaled_loss):
+                scaled_loss = _scale_tensors(list(prescaled_loss), scale)
+            else:
+                scaled_loss = [
+                    l * scale if isinstance(l,
+                                            torch.Tensor) else l for l in prescaled_loss
+                ]
         else:
             scaled_loss = prescaled_loss
             if self.warn_unscaled_loss:
@@ -706,32 +1070,69 @@ class DeepSpeedLight(Module):
             **kwargs: variable length keyword arguments
         """
 
-        if self.wall_clock_breakdown():
-            self.timers('forward_microstep').start()
-            self.timers('forward').start()
-
-        if self.training_dataloader is None:
-            self.tput_timer.start()
-        loss = self.module(*inputs, **kwargs)
-
-        if self.wall_clock_breakdown():
-            self.timers('forward').stop()
-            self.timers('forward_microstep').stop()
+        with self._timed('forward_microstep', 'forward'):
+            if self.training_dataloader is None:
+                self.tput_timer.start()
+            loss = self.module(*inputs, **kwargs)
 
         return loss
 
+    def _queue_loss_summary(self, loss):
+        # Avoid a device sync through .item(), free the oldest slot only if
+        # the device is a full buffer of boundaries behind
+        if len(self._pending_loss_summaries) == LOSS_SUMMARY_SLOTS:
+            self._write_loss_summaries(block=True)
+        slot = self._loss_summary_buffer[self._loss_summary_slot]
+        self._loss_summary_slot = (self._loss_summary_slot + 1) % LOSS_SUMMARY_SLOTS
+        slot.copy_(loss.detach().mean().float() * self.gradient_accumulation_steps(),
+                   non_blocking=True)
+        copy_done = torch.cuda.Event()
+        copy_done.record()
+        self._pending_loss_summaries.append((slot, copy_done, self.sample_count))
+        self._write_loss_summaries()
+
+    def _write_loss_summaries(self, block=False):
+        written = False
+        while self._pending_loss_summaries:
+            slot, copy_done, sample_count = self._pending_loss_summaries[0]
+            if block:
+                copy_done.synchronize()
+            elif not copy_done.query():
+                break
+            self._pending_loss_summaries.pop(0)
+            self.summary_events = [(f'Train/Samples/train_loss',
+                                    slot.item(),
+                                    sample_count)]
+            for event in self.summary_events:  # write_summary_events
+                self.summary_writer.add_scalar(event[0], event[1], event[2])
+            written = True
+        if written:
+            self.summary_writer.flush()
+
+    def _timed(self, *names):
+        if self._wall_clock_breakdown:
+            return self.timers.timed(*names)
+        return _no_timing()
+
     def allreduce_gradients(self, bucket_size=MEMORY_OPT_ALLREDUCE_SIZE):
         if self.is_gradient_accumulation_boundary():
-            if self.zero_optimization_stage() == ZERO_OPTIMIZATION_OPTIMIZER_STATES:
-                assert self.zero_reduce_scatter()
+            zero_stage = self._zero_optimization_stage
+            if zero_stage == ZERO_OPTIMIZATION_OPTIMIZER_STATES:
+                assert self._zero_reduce_scatter
                 self.optimizer.reduce_scatter_gradients(
-                    postscale_gradients=self.postscale_gradients(),
-                    gradient_predivide_factor=self.gradient_predivide_factor(),
+                    postscale_gradients=self._postscale_gradients,
+                    gradient_predivide_factor=self._gradient_predivide_factor,
                     gradient_average=self.gradient_average)
-            elif self.zero_optimization_partition_gradients():
+            elif zero_stage >= ZERO_OPTIMIZATION_GRADIENTS:
                 self.optimizer.overlapping_partition_gradients_reduce_epilogue()
             else:
-                self.buffered_allreduce_fallback(elements_per_buffer=bucket_size)
+                self.comm_stream.wait_stream(torch.cuda.current_stream())
+                with torch.cuda.stream(self.comm_stream):
+                    if self._overlap_comm_active:
+                        self._overlap_comm_epilogue()
+                    else:
+                        self.buffered_allreduce_fallback(elements_per_buffer=bucket_size)
+                torch.cuda.current_stream().wait_stream(self.comm_stream)
 
     def backward(self, loss, allreduce_gradients=True):
         r"""Execute backward pass on the loss
@@ -741,81 +1142,79 @@ class DeepSpeedLight(Module):
             allreduce_gradients: If this is False, then gradient averaging will be skipped. Default is True.
         """
 
+        boundary = self.is_gradient_accumulation_boundary()
+
         # scale loss w.r.t. gradient accumulation if needed
         if self.gradient_accumulation_steps() > 1:
             loss = self._scale_loss(loss.float())
 
         # Log training Loss
         if self.tensorboard_enabled():
-            if self.is_gradient_accumulation_boundary():
+            if boundary:
                 if self.global_rank == 0:
-                    self.sample_count += (self.train_micro_batch_size_per_gpu() *
-                                          self.dp_world_size *
-                                          self.gradient_accumulation_steps())
-                    self.summary_events = [
-                        (f'Train/Samples/train_loss',
-                         loss.mean().item() * self.gradient_accumulation_steps(),
-                         self.sample_count)
-                    ]
-                    for event in self.summary_events:  # write_summary_events
-                        self.summary_writer.add_scalar(event[0], event[1], event[2])
-                    self.summary_writer.flush()
-
-        if self.wall_clock_breakdown():
-            self.timers('backward_microstep').start()
-            self.timers('backward').start()
-
-        assert self.optimizer is not None, "must provide optimizer during " \
-                                           "init in order to use backward"
-
-        if self.wall_clock_breakdown():
-            self.timers('backward_inner_microstep').start()
-            self.timers('backward_inner').start()
-
-        if self.zero_optimization():
-            self.optimizer.backward(loss)
-        elif self.amp_enabled():
-            # AMP requires delaying unscale when inside gradient accumulation boundaries
-            # https://nvidia.github.io/apex/advanced.html#gradient-accumulation-across-iterations
-            delay_unscale = not self.is_gradient_accumulation_boundary()
-            with amp.scale_loss(loss,
-                                self.optimizer,
-                                delay_unscale=delay_unscale) as scaled_loss:
-                scaled_loss.backward()
-        elif self.fp16_enabled():
-            self.optimizer.backward(loss)
-        else:
-            loss.backward()
-
-        if self.wall_clock_breakdown():
-            self.timers('backward_inner').stop()
-            self.timers('backward_inner_microstep').stop()
-
-        if self.wall_clock_breakdown():
-            self.timers('backward_allreduce_microstep').start()
-            self.timers('backward_allreduce').start()
-
-        if allreduce_gradients:
-            self.allreduce_gradients()
+                    self.sample_count += self._samples_per_step
+                    self._queue_loss_summary(loss)
+
+        with self._timed('backward_microstep', 'backward'):
+            assert self.optimizer is not None, "must provide optimizer during " \
+                                               "init in order to use backward"
+
+            with self._timed('backward_inner_microstep', 'backward_inner'):
+                # Gradient allreduce is started from the backward hooks on the last
+                # micro step when overlap_comm is enabled
+                reduce_now = allreduce_gradients and boundary
+                self._overlap_comm_active = self.overlap_comm() and reduce_now
+                if self._overlap_comm_active and self._overlap_trainable != [
+                        param.requires_grad for param in self._all_params
+                ]:
+                    self._configure_overlap_comm()
+
+                if self.zero_optimization():
+                    self.optimizer.backward(loss)
+                elif self.amp_enabled():
+                    # AMP requires delaying unscale when inside gradient accumulation boundaries
+                    # https://nvidia.github.io/apex/advanced.html#gradient-accumulation-across-iterations
+                    delay_unscale = not boundary
+                    from apex import amp
+                    with amp.scale_loss(loss,
+                                        self.optimizer,
+                                        delay_unscale=delay_unscale) as scaled_loss:
+                        scaled_loss.backward()
+                elif self.fp16_enabled():
+                    self.optimizer.backward(loss)
+                else:
+                    loss.backward()
 
-        if self.wall_clock_breakdown():
-            self.timers('backward_allreduce').stop()
-            self.timers('backward_allreduce_microstep').stop()
-            self.timers('backward').stop()
-            self.timers('backward_microstep').stop()
+            with self._timed('backward_allreduce_microstep', 'backward_allreduce'):
+                if allreduce_gradients:
+                    self.allreduce_gradients()
 
         return loss
 
     def is_gradient_accumulation_boundary(self):
-        return (self.micro_steps + 1) % \
-            self.gradient_accumulation_steps() == 0
+        return (self.micro_steps + 1) % self._grad_accum_steps == 0
 
-    def zero_grad(self):
+    def zero_grad(self, set_to_none=True):
         """
         Zero parameter grads.
+
+        Arguments:
+            set_to_none: If True, release the gradients, otherwise zero them in
+                place so their buffers are reused by the next backward. Default is True.
         """
-        for param_name, param in self.module.named_parameters():
-            param.grad = None
+        if set_to_none:
+            for param in self._all_params:
+                param.grad = None
+        else:
+            grads = [param.grad for param in self._all_params if param.grad is not None]
+            if not grads:
+                return
+            # Single fused launch where available (torch>=1.7)
+            if hasattr(torch, '_foreach_zero_'):
+                torch._foreach_zero_(grads)
+            else:
+                for grad in grads:
+                    grad.zero_()
 
     def clip_fp32_gradients(self):
         torch.nn.utils.clip_grad_norm_(parameters=self.module.parameters(),
@@ -824,68 +1223,68 @@ class DeepSpeedLight(Module):
     def step(self):
         r"""Execute the weight update step after forward and backward propagation on effective_train_batch
         """
-        if self.wall_clock_breakdown():
-            self.timers('step_microstep').start()
-            self.timers('step').start()
-
-        assert self.optimizer is not None, "must provide optimizer during " \
-                                           "init in order to use step"
-        report_progress = self.global_rank == 0 if self.global_rank else True
-
-        if self.is_gradient_accumulation_boundary():
-
-            if self.gradient_clipping() > 0.0:
-                if not self.fp16_enabled() and not self.amp_enabled():
-                    self.clip_fp32_gradients()
-                elif self.amp_enabled():
-                    # AMP's recommended way of doing clipping
-                    # https://nvidia.github.io/apex/advanced.html#gradient-clipping
-                    master_params = amp.master_params(self.optimizer)
-                    torch.nn.utils.clip_grad_norm_(parameters=master_params,
-                                                   max_norm=self.gradient_clipping())
-
-            self.optimizer.step()
-
-            #zero grad in basic optimizer could be unreliable and may not exhibit
-            #the behaviour that we want
-            if not self.zero_optimization() and not self.fp16_enabled(
-            ) and not self.amp_enabled():
-                self.zero_grad()
-            else:
-                self.optimizer.zero_grad()
+        with self._timed('step_microstep', 'step'):
+            assert self.optimizer is not None, "must provide optimizer during " \
+                                               "init in order to use step"
+            report_progress = self.global_rank == 0 if self.global_rank else True
+            boundary = self.is_gradient_accumulation_boundary()
+
+            if boundary:
+
+                if self.gradient_clipping() > 0.0:
+                    if not self.fp16_enabled() and not self.amp_enabled():
+                        self.clip_fp32_gradients()
+                    elif self.amp_enabled():
+                        # AMP's recommended way of doing clipping
+                        # https://nvidia.github.io/apex/advanced.html#gradient-clipping
+                        from apex import amp
+                        master_params = amp.master_params(self.optimizer)
+                        torch.nn.utils.clip_grad_norm_(parameters=master_params,
+                                                       max_norm=self.gradient_clipping())
+
+                self.optimizer.step()
+
+                #zero grad in basic optimizer could be unreliable and may not exhibit
+                #the behaviour that we want
+                if not self.zero_optimization() and not self.fp16_enabled(
+                ) and not self.amp_enabled():
+                    self.zero_grad()
+                else:
+                    self.optimizer.zero_grad()
 
-            # Check overlow here since in DS fp16 optimizer, the overflow is updated in above step() function.
-            overflow = False
-            if hasattr(self.optimizer, 'overflow'):
-                overflow = self.optimizer.overflow
+                # Check overlow here since in DS fp16 optimizer, the overflow is updated in above step() function.
+                overflow = False
+                if hasattr(self.optimizer, 'overflow'):
+                    overflow = self.optimizer.overflow
 
-            if overflow:
-                self.skipped_steps += 1
-            else:
-                if self.lr_scheduler is not None:
-                    self.lr_scheduler.step()
-                if report_progress and (self.global_steps +
-                                        1) % self.steps_per_print() == 0:
-                    self._report_progress(self.global_steps + 1)
+                if overflow:
+                    self.skipped_steps += 1
+                else:
+                    if self.lr_scheduler is not None:
+                        self.lr_scheduler.step()
+                    if report_progress and (self.global_steps +
+                                            1) % self.steps_per_print() == 0:
+                        self._report_progress(self.global_steps + 1)
 
-            self.global_steps += 1
+                self.global_steps += 1
 
-        self.tput_timer.stop(report_progress)
+            self.tput_timer.stop(report_progress)
 
-        # Log learning rate
-        if self.tensorboard_enabled():
-            if self.is_gradient_accumulation_boundary():
-                if self.global_rank == 0:
-                    self.summary_events = [(f'Train/Samples/lr',
-                                            self.get_lr()[0],
-                                            self.sample_count)]
-                    for event in self.summary_events:  # write_summary_events
-                        self.summary_writer.add_scalar(event[0], event[1], event[2])
-                    self.summary_writer.flush()
+            # Log learning rate
+            if self.tensorboard_enabled():
+                if boundary:
+                    if self.global_rank == 0:
+                        # Pending losses are drained at least every steps_per_print
+                        print_step = self.global_steps % self.steps_per_print() == 0
+                        self._write_loss_summaries(block=print_step)
+                        self.summary_events = [(f'Train/Samples/lr',
+                                                self.get_lr()[0],
+                                                self.sample_count)]
+                        for event in self.summary_events:  # write_summary_events
+                            self.summary_writer.add_scalar(event[0], event[1], event[2])
+                        self.summary_writer.flush()
 
         if self.wall_clock_breakdown():
-            self.timers('step').stop()
-            self.timers('step_microstep').stop()
             timer_names = [
                 'forward_microstep',
                 'backward_microstep',
@@ -896,7 +1295,7 @@ class DeepSpeedLight(Module):
             self.timers.log(names=timer_names, memory_breakdown=self.memory_breakdown())
 
             # Log timing
-            if self.is_gradient_accumulation_boundary():
+            if boundary:
                 if self.tensorboard_enabled():
                     if self.global_rank == 0:
                         self.summary_events = [
@@ -959,31 +1358,65 @@ class DeepSpeedLight(Module):
             lr,
             mom))
 
-    def allreduce_bucket(self, bucket):
-        tensor = flatten(bucket)
-
+    def allreduce_bucket(self, bucket, async_op=False):
+        return self.allreduce_flat_tensor(flatten(bucket), async_op=async_op)
+
+    def _allreduce_scaling(self, dtype):
+        """Returns the (prescale, reduce op, postscale) of a gradient allreduce
+        in the given dtype, a scale of None is skipped."""
+        if not self.postscale_gradients():
+            if self._allreduce_avg:
+                # Predividing by the full world size is an average, which NCCL
+                # folds into the reduction kernel
+                return None, dist.ReduceOp.AVG, None
+            if self.dp_world_size == 1:
+                return None, dist.ReduceOp.SUM, None
+            return self._inv_dp_world_size, dist.ReduceOp.SUM, None
+
+        predivide = self.gradient_predivide_factor()
+        full_range = dtype in (torch.float32, torch.float64)
+        if self.gradient_average and self._allreduce_avg and (
+                full_range or predivide == self.dp_world_size):
+            return None, dist.ReduceOp.AVG, None
+
+        # Without the fp16 overflow concern the pre and post factors fold
+        # into a single scale
+        if full_range:
+            scale = self._inv_dp_world_size if self.gradient_average else 1. / predivide
+            return (scale if scale != 1.0 else None), dist.ReduceOp.SUM, None
+
+        prescale = 1. / predivide if predivide != 1.0 else None
+        postscale = None
+        if self.gradient_average and predivide != self.dp_world_size:
+            postscale = predivide * self._inv_dp_world_size
+        return prescale, dist.ReduceOp.SUM, postscale
+
+    def allreduce_flat_tensor(self, tensor, async_op=False):
+        """Averages a flat gradient tensor in place. With async_op, returns the
+        tensor and a handle whose wait() completes the allreduce."""
         tensor_to_allreduce = tensor
 
-        if self.allreduce_always_fp32():
+        if self.allreduce_bf16() and tensor.dtype == torch.float16:
+            # Same range as fp32 at half the bytes, gradients are only
+            # reduced in bf16 and copied back into the fp16 buffers
+            tensor_to_allreduce = tensor.to(torch.bfloat16)
+        elif self.allreduce_always_fp32() and tensor.dtype != torch.float32:
             tensor_to_allreduce = tensor.float()
 
-        if self.postscale_gradients():
-            if self.gradient_predivide_factor() != 1.0:
-                tensor_to_allreduce.mul_(1. / self.gradient_predivide_factor())
+        prescale, reduce_op, postscale = self._allreduce_scaling(
+            tensor_to_allreduce.dtype)
+        if prescale is not None:
+            tensor_to_allreduce.mul_(prescale)
 
-            dist.all_reduce(tensor_to_allreduce, group=self.data_parallel_group)
-
-            if self.gradient_average:
-                if self.gradient_predivide_factor() != self.dp_world_size:
-                    tensor_to_allreduce.mul_(self.gradient_predivide_factor() /
-                                             self.dp_world_size)
-        else:
-            tensor_to_allreduce.div_(self.dp_world_size)
-            dist.all_reduce(tensor_to_allreduce, group=self.data_parallel_group)
-
-        if self.allreduce_always_fp32() and tensor is not tensor_to_allreduce:
-            tensor.copy_(tensor_to_allreduce)
+        work = dist.all_reduce(tensor_to_allreduce,
+                               op=reduce_op,
+                               group=self.data_parallel_group,
+                               async_op=async_op)
 
+        handle = _AllreduceHandle(work, tensor, tensor_to_allreduce, postscale)
+        if async_op:
+            return tensor, handle
+        handle.wait()
         return tensor
 
     def allreduce_and_copy(self, small_bucket):
@@ -992,47 +1425,108 @@ class DeepSpeedLight(Module):
             buf.copy_(synced)
 
     def allreduce_no_retain(self, bucket, numel_per_bucket=500000000):
+        # The next bucket is launched before the previous one is copied back,
+        # but only a bounded number of flattened buckets are alive at once
+        pending = []
         small_bucket = []
         numel = 0
         for tensor in bucket:
             small_bucket.append(tensor)
             numel = numel + tensor.numel()
             if numel > numel_per_bucket:
-                self.allreduce_and_copy(small_bucket)
+                self._launch_no_retain(small_bucket, pending)
                 small_bucket = []
                 numel = 0
         if len(small_bucket) > 0:
-            self.allreduce_and_copy(small_bucket)
+            self._launch_no_retain(small_bucket, pending)
+
+        for small_bucket, allreduced, handle in pending:
+            self._copy_back_no_retain(small_bucket, allreduced, handle)
+
+    def _launch_no_retain(self, small_bucket, pending):
+        if len(pending) == ALLREDUCE_BUCKETS_IN_FLIGHT:
+            self._copy_back_no_retain(*pending.pop(0))
+        allreduced, handle = self.allreduce_bucket(small_bucket, async_op=True)
+        pending.append((small_bucket, allreduced, handle))
+
+    def _copy_back_no_retain(self, small_bucket, allreduced, handle):
+        handle.wait()
+        for buf, synced in zip(small_bucket, unflatten(allreduced, small_bucket)):
+            buf.copy_(synced)
 
     def buffered_allreduce_fallback(self, grads=None, elements_per_buffer=500000000):
-        grads = []
+        if grads is None:
+            split_buckets = self._build_grad_buckets()
+        else:
+            split_buckets = split_half_float_double_csr(grads)
+
+        current_stream = torch.cuda.current_stream()
+        for bucket_type, bucket in split_buckets:
+            stream = self._bucket_streams[bucket_type]
+            stream.wait_stream(current_stream)
+            with torch.cuda.stream(stream):
+                if bucket_type == CSR_TENSOR_TYPE:
+                    self.csr_allreduce_no_retain(bucket)
+                else:
+                    self.allreduce_no_retain(bucket,
+                                             numel_per_bucket=elements_per_buffer)
+        for bucket_type, _ in split_buckets:
+            current_stream.wait_stream(self._bucket_streams[bucket_type])
+
+    def _build_grad_buckets(self, csr_only=False):
+        split_buckets = []
+        for bucket_type, params in self._grad_buckets:
+            if csr_only and bucket_type != CSR_TENSOR_TYPE:
+                continue
+            bucket = [
+                self._grad_for_allreduce(param) for param in params
+                if param.requires_grad
+            ]
+            if not bucket:
+                continue
+            if bucket_type == CSR_TENSOR_TYPE:
+                bucket = [CSRTensor(grad_data) for grad_data in bucket]
+            split_buckets.append((bucket_type, bucket))
+        return split_buckets
+
+    def _is_csr_param(self, param_name):
+        return self.sparse_gradients_enabled(
+        ) and param_name in self.csr_tensor_module_names
+
+    def _configure_grad_table(self):
+        # Parameters reduced by buffered_allreduce_fallback, grouped once by
+        # the type of gradient they produce so that each step only has to
+        # look up the gradients. Frozen parameters stay in the groups and are
+        # skipped per step, since they may be unfrozen later in training.
+        groups = {bucket_type: [] for bucket_type in SPLIT_BUCKET_TYPES}
         for param_name, param in self.module.named_parameters():
-            if param.grad is None:
-                # In cases where there is an imbalance of empty grads across
-                # ranks we must create empty grads, this will ensure that every
-                # rank is reducing the same size. In some cases it may make
-                # sense in the future to support the ability to average not
-                # w.r.t. world size but with a different value.
-                grads.append(
-                    torch.zeros(param.size(),
-                                dtype=param.dtype,
-                                device=param.device))
+            if self._is_csr_param(param_name):
+                bucket_type = CSR_TENSOR_TYPE
             else:
-                grad_data = param.grad.data
-                if self.sparse_gradients_enabled(
-                ) and param_name in self.csr_tensor_module_names:
-                    grads.append(CSRTensor(grad_data))
-                else:
-                    grads.append(grad_data)
-
-        split_buckets = split_half_float_double_csr(grads)
-
-        for i, bucket_tuple in enumerate(split_buckets):
-            bucket_type, bucket = bucket_tuple
-            if bucket_type == CSRTensor.type():
-                self.csr_allreduce_no_retain(bucket)
+                bucket_type = param.type()
+            if bucket_type in groups:
+                groups[bucket_type].append(param)
+        self._grad_buckets = [(bucket_type,
+                               groups[bucket_type]) for bucket_type in SPLIT_BUCKET_TYPES
+                              if groups[bucket_type]]
+        self._empty_grads = {}
+
+    def _grad_for_allreduce(self, param):
+        if param.grad is None:
+            # In cases where there is an imbalance of empty grads across
+            # ranks we must create empty grads, this will ensure that every
+            # rank is reducing the same size. In some cases it may make
+            # sense in the future to support the ability to average not
+            # w.r.t. world size but with a different value.
+            grad_data = self._empty_grads.get(param)
+            if grad_data is None:
+                grad_data = torch.zeros_like(param)
+                self._empty_grads[param] = grad_data
             else:
-                self.allreduce_no_retain(bucket, numel_per_bucket=elements_per_buffer)
+                # The reduced values of the previous step were copied back
+                grad_data.zero_()
+            return grad_data
+        return param.grad.data
 
     def csr_allreduce_no_retain(self, bucket):
         allreduced_csrs = self.csr_allreduce_bucket(bucket)
@@ -1042,50 +1536,44 @@ class DeepSpeedLight(Module):
             csr.orig_dense_tensor.copy_(dense_tensor)
 
     def csr_allreduce_bucket(self, bucket):
+        # Exchange the row counts of all csr tensors in the bucket at once
+        my_sizes = torch.LongTensor([csr.indices.size()[0]
+                                     for csr in bucket]).to(self.device)
+        bucket_sizes = torch.stack(self.all_gather_scalar(my_sizes)).t().cpu().tolist()
         csr_list = []
-        for csr in bucket:
-            csr_list.append(self.csr_allreduce(csr))
+        for csr, all_sizes in zip(bucket, bucket_sizes):
+            csr_list.append(self.csr_allreduce(csr, all_sizes))
         return csr_list
 
-    def csr_allreduce(self, csr):
+    def csr_allreduce(self, csr, all_sizes=None):
         # Pre-divide for fp16 stability
-        csr.values.div_(self.dp_world_size)
+        csr.values.mul_(self._inv_dp_world_size)
 
-        indices_device_list = self.csr_all_gather(csr.indices)
-        values_device_list = self.csr_all_gather(csr.values)
+        indices_device_list = self.csr_all_gather(csr.indices, all_sizes)
+        values_device_list = self.csr_all_gather(csr.values, all_sizes)
 
         csr.indices = torch.cat(indices_device_list)
         csr.values = torch.cat(values_device_list)
         return csr
 
-    def csr_all_gather(self, value):
-        my_size = torch.LongTensor([value.size()[0]]).to(self.device)
-        all_sizes = self.all_gather_scalar(my_size)
-        max_size = torch.cat(all_sizes).max()
-        fill_size = (max_size - my_size)
+    def csr_all_gather(self, value, all_sizes=None):
+        if all_sizes is None:
+            my_size = torch.LongTensor([value.size()[0]]).to(self.device)
+            # A single device to host copy of all sizes instead of one per rank
+            all_sizes = torch.cat(self.all_gather_scalar(my_size)).cpu().tolist()
+        max_size = max(all_sizes)
 
         assert value.dim() in [1, 2]
-        if value.dim() == 1:
-            if fill_size > 0:
-                value = torch.cat([value, value.new_zeros(fill_size)])
-            tensor_list = [value.new_zeros(max_size) for _ in range(self.dp_world_size)]
-        else:
-            if fill_size > 0:
-                value = torch.cat([value, value.new_zeros(fill_size, value.size()[1])])
-            tensor_list = [
-                value.new_zeros(max_size,
-                                value.size()[1]) for _ in range(self.dp_world_size)
-            ]
+        padded_size = [max_size] + list(value.size()[1:])
+        if value.size()[0] < max_size:
+            padded_value = value.new_zeros(padded_size)
+            padded_value.narrow(0, 0, value.size()[0]).copy_(value)
+            value = padded_value
+        tensor_list = [value.new_zeros(padded_size) for _ in range(self.dp_world_size)]
 
         dist.all_gather(tensor_list, value, group=self.data_parallel_group)
-        tensors = []
-        for dev_idx, t in enumerate(tensor_list):
-            size = all_sizes[dev_idx][0]
-            tensors.append(
-                t.index_select(0,
-                               torch.LongTensor(range(size)).to(self.device)))
-
-        return tensors
+        # Every rank sent a zero padded prefix, narrowing is a view
+        return [t.narrow(0, 0, size) for t, size in zip(tensor_list, all_sizes)]
 
     def all_gather_scalar(self, value):
         tensor_list = [value.new_zeros(value.size()) for _ in range(self.dp_world_size)]
@@ -1144,6 +1632,8 @@ class DeepSpeedLight(Module):
             client_state: State dictionary used for loading required training states in the client code.
         """
 
+        self.wait_for_checkpoint_save()
+
         load_path, client_states = self._load_checkpoint(load_dir,
                                                          tag,
                                                          load_module_strict=load_module_strict,
@@ -1189,6 +1679,9 @@ class DeepSpeedLight(Module):
             self.lr_scheduler.load_state_dict(checkpoint['lr_scheduler'])
 
         self.csr_tensor_module_names = checkpoint['csr_tensor_module_names']
+        self._configure_grad_table()
+        if self.overlap_comm():
+            self._configure_overlap_comm()
         self.global_steps = checkpoint['global_steps']
         self.skipped_steps = checkpoint['skipped_steps']
         self.loaded_checkpoint_mp_world_size = checkpoint['mp_world_size']
@@ -1258,10 +1751,13 @@ class DeepSpeedLight(Module):
             tag=tag,
             mp_rank=mp_rank,
             dp_world_size=self.loaded_checkpoint_dp_world_size)
-        invalid_zero_ckpt_paths = []
-        for ckpt_name in zero_ckpt_names:
-            if not os.path.exists(ckpt_name):
-                invalid_zero_ckpt_paths.append(ckpt_name)
+        # All shards live in the tag directory, list it once
+        ckpt_dir = os.path.join(load_dir, str(tag))
+        existing_files = set(os.listdir(ckpt_dir)) if os.path.isdir(ckpt_dir) else set()
+        invalid_zero_ckpt_paths = [
+            ckpt_name for ckpt_name in zero_ckpt_names
+            if os.path.basename(ckpt_name) not in existing_files
+        ]
 
         if len(invalid_zero_ckpt_paths) > 0:
             logging.warn(
@@ -1269,9 +1765,13 @@ class DeepSpeedLight(Module):
             )
             return None
 
-        zero_sd_list = []
-        for ckpt_name in zero_ckpt_names:
-            zero_sd_list.append(torch.load(ckpt_name, map_location='cpu'))
+        # Loading is dominated by storage reads, so read the shards concurrently
+        with ThreadPoolExecutor(max_workers=min(ZERO_CHECKPOINT_LOAD_WORKERS,
+                                                len(zero_ckpt_names))) as executor:
+            zero_sd_list = list(
+                executor.map(lambda ckpt_name: torch.load(ckpt_name,
+                                                          map_location='cpu'),
+                             zero_ckpt_names))
 
         zero_optimizer_sd = [sd['optimizer_state_dict'] for sd in zero_sd_list]
         print(
@@ -1291,6 +1791,14 @@ class DeepSpeedLight(Module):
         # This is to make sure the checkpoint names are created without collision
         # There seems to be issue creating them in parallel
 
+        if self.tensorboard_enabled() and self.global_rank == 0:
+            # Losses of all steps up to the checkpoint are written out
+            self._write_loss_summaries(block=True)
+
+        self.wait_for_checkpoint_save()
+        # Staging buffers are free again once earlier saves are written
+        self._checkpoint_buffers_used = {}
+
         if self.save_non_zero_checkpoint:
             self._create_checkpoint_file(save_dir, tag, False)
             self._save_checkpoint(save_dir, tag, client_state=client_state)
@@ -1350,11 +1858,51 @@ class DeepSpeedLight(Module):
         state.update(client_state)
 
         logger.info('Saving model checkpoint: {}'.format(save_path))
-        torch.save(state, save_path)
+        self._write_checkpoint(state, save_path)
 
     def _save_zero_checkpoint(self, save_path, tag):
         zero_checkpoint_name = self._get_zero_ckpt_name(save_path, tag)
         # self._ensure_directory_exists(zero_checkpoint_name)
         zero_sd = {'optimizer_state_dict': self.optimizer.state_dict()}
-        torch.save(zero_sd, zero_checkpoint_name)
+        self._write_checkpoint(zero_sd, zero_checkpoint_name)
         logger.info('zero checkpoint saved {}'.format(zero_checkpoint_name))
+
+    def _checkpoint_staging_buffer(self, tensor):
+        key = (tensor.size(), tensor.dtype)
+        buffers = self._checkpoint_buffers.setdefault(key, [])
+        index = self._checkpoint_buffers_used.get(key, 0)
+        if index == len(buffers):
+            buffer = torch.empty(tensor.size(), dtype=tensor.dtype, pin_memory=True)
+            buffers.append(buffer)
+        self._checkpoint_buffers_used[key] = index + 1
+        return buffers[index]
+
+    def _write_checkpoint(self, state, path):
+        if self._checkpoint_executor is None:
+            torch.save(state, path)
+            return
+
+        checkpoint_stream = self._checkpoint_stream
+        checkpoint_stream.wait_stream(torch.cuda.current_stream())
+        with torch.cuda.stream(checkpoint_stream):
+            cpu_state = _copy_to_cpu(state, self._checkpoint_staging_buffer)
+            copy_done = torch.cuda.Event()
+            copy_done.record()
+        # Training must not update the saved tensors before they are copied
+        torch.cuda.current_stream().wait_stream(checkpoint_stream)
+
+        self._checkpoint_futures.append(
+            self._checkpoint_executor.submit(_save_when_ready,
+                                             copy_done,
+                                             cpu_state,
+                                             path))
+
+    def wait_for_checkpoint_save(self):
+        """Block until all pending asynchronous checkpoint saves are on disk.
+
+        Any error hit while writing a checkpoint is raised here.
+        """
+        futures = self._checkpoint_futures
+        self._checkpoint_futures = []
+        for future in futures:
+            future.result()
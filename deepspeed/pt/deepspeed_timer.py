@@ -3,6 +3,8 @@ Copyright 2019 The Microsoft DeepSpeed Team
 '''
 
 import time
+from contextlib import contextmanager
+
 import psutil
 import torch
 
@@ -27,17 +29,19 @@ class SynchronizedWallClockTimer:
             self.started_ = False
             self.start_time = time.time()
 
-        def start(self):
+        def start(self, synchronize=True):
             """Start the timer."""
             assert not self.started_, 'timer has already been started'
-            torch.cuda.synchronize()
+            if synchronize:
+                torch.cuda.synchronize()
             self.start_time = time.time()
             self.started_ = True
 
-        def stop(self):
+        def stop(self, synchronize=True):
             """Stop the timer."""
             assert self.started_, 'timer is not started'
-            torch.cuda.synchronize()
+            if synchronize:
+                torch.cuda.synchronize()
             self.elapsed_ += (time.time() - self.start_time)
             self.started_ = False
 
@@ -70,6 +74,20 @@ class SynchronizedWallClockTimer:
             self.timers[name] = self.Timer(name)
         return self.timers[name]
 
+    @contextmanager
+    def timed(self, *names):
+        """Time a block with all given timers, synchronizing once on entry and exit."""
+        timers = [self(name) for name in names]
+        torch.cuda.synchronize()
+        for timer in timers:
+            timer.start(synchronize=False)
+        try:
+            yield
+        finally:
+            torch.cuda.synchronize()
+            for timer in reversed(timers):
+                timer.stop(synchronize=False)
+
     @staticmethod
     def memory_usage():
         alloc = "mem_allocated: {:.4f} GB".format(torch.cuda.memory_allocated() /
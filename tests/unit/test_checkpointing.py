@@ -116,6 +116,8 @@ def checkpoint_correctness_verification(args,
     save_tag = '1'
 
     trained_model.save_checkpoint(save_folder, save_tag)
+    # Asynchronous saves must land on disk before another engine loads them
+    trained_model.wait_for_checkpoint_save()
 
     loaded_model, _, _,_ = deepspeed.initialize(args=args,
                                             model=model,
@@ -457,3 +459,43 @@ def test_checkpoint_fp32_optimizer(tmpdir):
         checkpoint_correctness_verification(args, model, hidden_dim, tmpdir, fp16=False)
 
     _test_checkpoint_fp32_optimizer(args=args, model=model, hidden_dim=hidden_dim)
+
+
+@pytest.mark.parametrize("zero_stage", [0, 1, 2])
+def test_checkpoint_async_save(tmpdir, zero_stage):
+    config_dict = {
+        "train_batch_size": 2,
+        "steps_per_print": 1,
+        "optimizer": {
+            "type": "Adam",
+            "params": {
+                "lr": 0.00015,
+                "betas": [0.8,
+                          0.999],
+                "eps": 1e-8,
+                "weight_decay": 3e-7
+            }
+        },
+        "fp16": {
+            "enabled": True
+        },
+        "zero_optimization": {
+            "stage": zero_stage
+        },
+        "async_checkpoint": True
+    }
+
+    args = args_from_dict(tmpdir, config_dict)
+    hidden_dim = 10
+
+    model = SimpleModel(hidden_dim, empty_grad=False)
+
+    @distributed_test(world_size=[2])
+    def _test_checkpoint_async_save(args, model, hidden_dim):
+        checkpoint_correctness_verification(args,
+                                            model,
+                                            hidden_dim,
+                                            tmpdir,
+                                            load_optimizer_states=True)
+
+    _test_checkpoint_async_save(args=args, model=model, hidden_dim=hidden_dim)
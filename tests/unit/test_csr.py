@@ -48,3 +48,23 @@ def test_csr_addition_different():
     cx.add(cy)
 
     assert torch.all(dense_sum == cx.to_dense())
+
+
+def test_split_half_float_double_csr_order():
+    from deepspeed.pt.deepspeed_light import split_half_float_double_csr, CSR_TENSOR_TYPE
+
+    half = torch.ones(2, 5).cuda().half()
+    fp32 = torch.ones(2, 5).cuda()
+    csr = CSRTensor(torch.ones(2, 5).cuda())
+    cpu = torch.ones(2, 5)
+
+    buckets = split_half_float_double_csr([csr, fp32, cpu, half, fp32])
+    bucket_types = [bucket_type for bucket_type, _ in buckets]
+    assert bucket_types == [
+        "torch.cuda.HalfTensor",
+        "torch.cuda.FloatTensor",
+        CSR_TENSOR_TYPE
+    ]
+    assert buckets[0][1] == [half]
+    assert len(buckets[1][1]) == 2
+    assert buckets[2][1] == [csr]
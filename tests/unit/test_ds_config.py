@@ -33,3 +33,49 @@ def test_config_duplicate_key(tmpdir):
 
     with pytest.raises(ValueError):
         run_cfg = ds_config.DeepSpeedConfig(config_path)
+
+
+@pytest.mark.parametrize('fp16,fast_math,expected',
+                         [(False,
+                           None,
+                           False),
+                          (True,
+                           None,
+                           True),
+                          (True,
+                           False,
+                           False),
+                          (False,
+                           True,
+                           True)])
+def test_fast_math_default(tmpdir, fp16, fast_math, expected):
+    config_dict = {'train_batch_size': 1, 'fp16': {'enabled': fp16}}
+    if fast_math is not None:
+        config_dict['enable_fast_math'] = fast_math
+    config_path = os.path.join(tmpdir, 'temp_config.json')
+
+    with open(config_path, 'w') as jf:
+        json.dump(config_dict, jf)
+
+    run_cfg = ds_config.DeepSpeedConfig(config_path)
+    assert run_cfg.fast_math_enabled == expected
+
+
+def test_bf16_allreduce_with_zero(tmpdir):
+    config_dict = {
+        'train_batch_size': 1,
+        'fp16': {
+            'enabled': True
+        },
+        'zero_optimization': {
+            'stage': 1
+        },
+        'bf16_allreduce': True
+    }
+    config_path = os.path.join(tmpdir, 'temp_config.json')
+
+    with open(config_path, 'w') as jf:
+        json.dump(config_dict, jf)
+
+    with pytest.raises(AssertionError):
+        run_cfg = ds_config.DeepSpeedConfig(config_path)
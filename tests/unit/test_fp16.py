@@ -4,6 +4,8 @@ import argparse
 import pytest
 import json
 import os
+import copy
+import torch.distributed as dist
 from common import distributed_test
 from simple_model import SimpleModel, SimpleOptimizer, random_dataloader, args_from_dict
 
@@ -155,6 +157,108 @@ def test_adam_fp32_empty_grad(tmpdir):
     _test_adam_fp32_empty_grad(args=args, model=model, hidden_dim=hidden_dim)
 
 
+@pytest.mark.parametrize("fp16_enabled", [True, False])
+def test_overlap_comm_empty_grad(tmpdir, fp16_enabled):
+    config_dict = {
+        "train_batch_size": 2,
+        "steps_per_print": 1,
+        "optimizer": {
+            "type": "Adam",
+            "params": {
+                "lr": 0.00015
+            }
+        },
+        "fp16": {
+            "enabled": fp16_enabled
+        }
+    }
+    args = args_from_dict(tmpdir.mkdir("fallback"), config_dict)
+    config_dict["overlap_comm"] = True
+    overlap_args = args_from_dict(tmpdir.mkdir("overlap"), config_dict)
+    hidden_dim = 10
+
+    @distributed_test(world_size=[2])
+    def _test_overlap_comm_empty_grad(args, overlap_args, hidden_dim):
+        # Only rank 0 uses linear2, so its bucket is never ready on rank 1
+        # and has to be reduced in order by the epilogue
+        rank = dist.get_rank()
+        model = SimpleModel(hidden_dim, empty_grad=True, rank=rank)
+        overlap_model = copy.deepcopy(model)
+
+        engines = []
+        for engine_args, module in ((args, model), (overlap_args, overlap_model)):
+            engine, _, _, _ = deepspeed.initialize(args=engine_args,
+                                                   model=module,
+                                                   model_parameters=module.parameters())
+            engines.append(engine)
+
+        dtype = torch.half if fp16_enabled else torch.float
+        torch.manual_seed(rank)
+        x = torch.randn(1, hidden_dim, device=engines[0].device, dtype=dtype)
+        y = torch.randint(hidden_dim, (1, ), device=engines[0].device)
+
+        grads = []
+        for engine in engines:
+            loss = engine(x, y)
+            engine.backward(loss)
+            grads.append([
+                None if param.grad is None else param.grad.float().clone()
+                for param in engine.module.parameters()
+            ])
+
+        for grad, overlap_grad in zip(*grads):
+            assert (grad is None) == (overlap_grad is None)
+            if grad is not None:
+                assert torch.allclose(grad, overlap_grad)
+
+    _test_overlap_comm_empty_grad(args=args,
+                                  overlap_args=overlap_args,
+                                  hidden_dim=hidden_dim)
+
+
+@pytest.mark.parametrize("overlap_comm", [False, True])
+def test_unfreeze_after_initialize(tmpdir, overlap_comm):
+    config_dict = {
+        "train_batch_size": 2,
+        "steps_per_print": 1,
+        "optimizer": {
+            "type": "Adam",
+            "params": {
+                "lr": 0.00015
+            }
+        },
+        "overlap_comm": overlap_comm
+    }
+    args = args_from_dict(tmpdir, config_dict)
+    hidden_dim = 10
+
+    @distributed_test(world_size=[2])
+    def _test_unfreeze_after_initialize(args, hidden_dim):
+        model = SimpleModel(hidden_dim)
+        model.linear.weight.requires_grad_(False)
+        model, _, _,_ = deepspeed.initialize(args=args,
+                                             model=model,
+                                             model_parameters=model.parameters())
+
+        # Unfreeze once the engine has set up its gradient reduction
+        model.module.linear.weight.requires_grad_(True)
+
+        torch.manual_seed(dist.get_rank())
+        x = torch.randn(1, hidden_dim, device=model.device)
+        y = torch.randint(hidden_dim, (1, ), device=model.device)
+        loss = model(x, y)
+        model.backward(loss)
+
+        # Averaged gradients are identical on every rank
+        grad = model.module.linear.weight.grad
+        assert grad is not None
+        grads = [torch.zeros_like(grad) for _ in range(dist.get_world_size())]
+        dist.all_gather(grads, grad)
+        assert torch.allclose(grads[0], grads[1])
+
+    _test_unfreeze_after_initialize(args=args, hidden_dim=hidden_dim)
+
+
 def test_adamw_fp16_basic(tmpdir):
     config_dict = {
         "train_batch_size": 1,
@@ -186,6 +290,111 @@ def test_adamw_fp16_basic(tmpdir):
     _test_adamw_fp16_basic(args=args, model=model, hidden_dim=hidden_dim)
 
 
+def test_adam_fp16_bf16_allreduce(tmpdir):
+    config_dict = {
+        "train_batch_size": 2,
+        "steps_per_print": 1,
+        "optimizer": {
+            "type": "Adam",
+            "params": {
+                "lr": 0.00015
+            }
+        },
+        "fp16": {
+            "enabled": True
+        },
+        "bf16_allreduce": True
+    }
+    args = args_from_dict(tmpdir, config_dict)
+    hidden_dim = 10
+
+    model = SimpleModel(hidden_dim, empty_grad=False)
+
+    @distributed_test(world_size=[2])
+    def _test_adam_fp16_bf16_allreduce(args, model, hidden_dim):
+        model, _, _,_ = deepspeed.initialize(args=args,
+                                             model=model,
+                                             model_parameters=model.parameters())
+        data_loader = random_dataloader(model=model,
+                                        total_samples=50,
+                                        hidden_dim=hidden_dim,
+                                        device=model.device)
+        for n, batch in enumerate(data_loader):
+            loss = model(batch[0], batch[1])
+            model.backward(loss)
+            model.step()
+
+    _test_adam_fp16_bf16_allreduce(args=args, model=model, hidden_dim=hidden_dim)
+
+
+class _ScalingConfig:
+    def __init__(self, postscale, predivide, average, world_size, allreduce_avg):
+        self._postscale = postscale
+        self._predivide = predivide
+        self.gradient_average = average
+        self.dp_world_size = world_size
+        self._inv_dp_world_size = 1.0 / world_size
+        self._allreduce_avg = allreduce_avg
+
+    def postscale_gradients(self):
+        return self._postscale
+
+    def gradient_predivide_factor(self):
+        return self._predivide
+
+
+@pytest.mark.parametrize("dtype", [torch.float16, torch.bfloat16, torch.float32])
+@pytest.mark.parametrize("allreduce_avg", [False, True])
+@pytest.mark.parametrize("world_size", [1, 2, 8])
+@pytest.mark.parametrize("postscale,predivide,average",
+                         [(False,
+                           1.0,
+                           True),
+                          (True,
+                           1.0,
+                           True),
+                          (True,
+                           2.0,
+                           True),
+                          (True,
+                           8.0,
+                           True),
+                          (True,
+                           1.0,
+                           False),
+                          (True,
+                           2.0,
+                           False)])
+def test_allreduce_scaling(dtype,
+                           allreduce_avg,
+                           world_size,
+                           postscale,
+                           predivide,
+                           average):
+    if allreduce_avg and not hasattr(dist.ReduceOp, 'AVG'):
+        pytest.skip("torch.distributed has no ReduceOp.AVG")
+
+    config = _ScalingConfig(postscale, predivide, average, world_size, allreduce_avg)
+    prescale, reduce_op, post = deepspeed.DeepSpeedLight._allreduce_scaling(config,
+                                                                            dtype)
+    factor = prescale if prescale is not None else 1.0
+    if reduce_op == dist.ReduceOp.SUM:
+        factor *= world_size
+    else:
+        assert allreduce_avg
+    if post is not None:
+        factor *= post
+
+    # Scaling without fusion: predivide, sum, then postscale
+    if postscale:
+        expected = world_size / predivide
+        if average and predivide != world_size:
+            expected *= predivide / world_size
+    else:
+        expected = 1.0
+    assert factor == pytest.approx(expected)
+
+
 def test_adamw_fp16_empty_grad(tmpdir):
     config_dict = {
         "train_batch_size": 1,